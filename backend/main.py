@@ -1,28 +1,75 @@
+import asyncio
+import functools
 import json
 import logging
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 from urllib.parse import urlparse
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+import xxhash
+from cachetools import TTLCache
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from bs4 import BeautifulSoup
 
 # Import from modular scraper package
+from backend.scraper.http_client import close_client
 from backend.scraper.static_fetch import static_scrape
+from backend.scraper.parse_worker import shutdown_parse_pool
+from backend.scraper.browser_runtime import BROWSER_POOL
 from backend.scraper.playwright_scraper import (
     js_scrape_with_playwright,
     js_scrape_hard,
     js_scrape_full,
 )
-from backend.scraper.parsers.sections import parse_sections_from_soup
-from backend.scraper.utils import make_absolute_url
+from backend.scraper.models import Section, SectionContent
+from backend.scraper.parsers.sections import parse_sections_from_soup, shutdown_process_pool
+from backend.scraper.utils import normalize_url, extract_page_meta, parse_html, is_app_shell, truncate_at_tag
 
 LOG = logging.getLogger("uvicorn.error")
 
-app = FastAPI(title="Lyftr Scraper (backend)")
+app = FastAPI(title="Lyftr Scraper (backend)", default_response_class=ORJSONResponse)
+# rawHtml-heavy results compress very well; level 4 keeps CPU cost low.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
+# CPU-bound HTML parsing is dispatched to a dedicated pool so the event loop
+# stays free; static fetches and Playwright are natively async.
+_PARSE_POOL = ThreadPoolExecutor(
+    max_workers=(os.cpu_count() or 1) * 4, thread_name_prefix="scrape-parse"
+)
+
+# JS escalation thresholds. Below MIN_TEXT_LEN chars of section text a render
+# is considered insufficient; a static result with at least STATIC_OK_TEXT
+# chars across STATIC_OK_SECTIONS sections never touches Playwright.
+MIN_TEXT_LEN = int(os.getenv("SCRAPER_MIN_TEXT", "300"))
+STATIC_OK_TEXT = int(os.getenv("SCRAPER_STATIC_OK_TEXT", "2000"))
+STATIC_OK_SECTIONS = int(os.getenv("SCRAPER_STATIC_OK_SECTIONS", "5"))
+
+# Static HTML beyond this size is cut before parsing.
+MAX_HTML_CHARS = int(os.getenv("SCRAPER_MAX_HTML", "2000000"))
+
+# /scrape_batch limits.
+BATCH_CONCURRENCY = int(os.getenv("SCRAPER_BATCH_CONCURRENCY", "16"))
+BATCH_MAX_URLS = int(os.getenv("SCRAPER_BATCH_MAX_URLS", "100"))
+
+# Successful results keyed by normalized URL. Only touched from the event loop,
+# so no lock is needed; cached dicts are never mutated after being stored.
+_CACHE: TTLCache = TTLCache(
+    maxsize=int(os.getenv("SCRAPER_CACHE_SIZE", "10000")),
+    ttl=int(os.getenv("SCRAPER_CACHE_TTL", "3600")),
+)
+# URLs that ended in the empty fallback, so repeats skip the whole
+# static -> normal -> full -> hard ladder for a short while.
+_NEG_CACHE: TTLCache = TTLCache(
+    maxsize=int(os.getenv("SCRAPER_CACHE_SIZE", "10000")),
+    ttl=int(os.getenv("SCRAPER_NEG_CACHE_TTL", "300")),
+)
 
 
 # -----------------------
@@ -32,6 +79,154 @@ def error_obj(message: str, phase: str):
     return {"message": message, "phase": phase}
 
 
+_UTC = timezone.utc
+
+
+def now_iso() -> str:
+    """Current UTC time as ISO-8601 (same format as datetime.now(timezone.utc).isoformat())."""
+    return datetime.fromtimestamp(time.time(), _UTC).isoformat()
+
+
+# Only immutable values, so a shallow dict() copy is a fresh meta block.
+_META_EMPTY = {"title": "", "description": "", "language": "", "canonical": None}
+
+
+# Render errors that indicate the site is blocking automation.
+_BLOCK_RE = re.compile(r"403|blocked|access denied", re.IGNORECASE)
+
+# Rejections are answered before any per-request state is built.
+_UNSUPPORTED_SCHEME = {
+    "success": False,
+    "error": "Only HTTP/HTTPS URLs are supported",
+    "errors": [error_obj("Unsupported URL scheme", "validation")],
+}
+
+
+async def run_in_pool(pool: ThreadPoolExecutor, fn, *args, **kwargs):
+    """Run a blocking callable in ``pool`` without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+
+
+def result_response(result: Dict[str, Any], request: Request, cache_status: str) -> Response:
+    """
+    Serialize a scrape result with a content-hash ETag. A client that
+    already holds this exact body (If-None-Match) gets an empty 304.
+    """
+    body = orjson.dumps({"result": result})
+    etag = '"' + xxhash.xxh3_128_hexdigest(body) + '"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300", "X-Cache": cache_status}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, status_code=200, media_type="application/json", headers=headers)
+
+
+def ndjson_lines(result: Dict[str, Any]):
+    """
+    A scrape result as NDJSON: one line with everything but the sections,
+    then one line per section, each serialized only when it is sent.
+    """
+    head = {k: v for k, v in result.items() if k != "sections"}
+    yield orjson.dumps(head) + b"\n"
+    for section in result["sections"]:
+        yield orjson.dumps(section) + b"\n"
+
+
+def sections_text_len(sections: List[Section]) -> int:
+    return sum(len(s.content.text) for s in sections)
+
+
+def raw_html_key(section: Section) -> int:
+    """64-bit xxh3 digest of a section's rawHtml, used for merge dedup."""
+    return xxhash.xxh3_64_intdigest(section.rawHtml.encode("utf-8", "ignore"))
+
+
+def parse_static_html(text: str, url: str) -> Tuple[Dict[str, Any], List[Section], List[Dict[str, str]], bool]:
+    """
+    Parse the static HTML into (meta, sections, errors, app_shell), where
+    app_shell flags a client-rendered page whose content needs JS.
+    CPU-bound; runs inside the parse pool.
+    """
+    meta: Dict[str, Any] = {}
+    sections: List[Section] = []
+    errors: List[Dict[str, str]] = []
+    app_shell = False
+
+    try:
+        # Parse once; meta and sections share the same tree.
+        root = parse_html(text)
+        meta.update(extract_page_meta(root, url))
+        app_shell = is_app_shell(root)
+
+        # Extract sections
+        try:
+            sections = parse_sections_from_soup(root, source_url=url, html=text)
+        except Exception as e:
+            LOG.exception("parse_sections_from_soup failed")
+            errors.append(error_obj(f"Section parsing failed: {str(e)}", "parse"))
+
+    except Exception as e:
+        LOG.exception("HTML parse error")
+        errors.append(error_obj(f"HTML parse error: {str(e)}", "parse"))
+
+    return meta, sections, errors, app_shell
+
+
+async def run_js_ladder(url: str) -> Dict[str, Any]:
+    """
+    JS scrape escalation (normal -> full -> hard) on the shared browser.
+    """
+    # Try lightweight JS render first
+    js_result = await js_scrape_with_playwright(url, max_scrolls=3)
+
+    # If this returned no useful content, or errors indicate blocking,
+    # escalate to the full JS engine which performs clicks/scrolls/pagination
+    blocked_or_insufficient = False
+
+    # check for blocking keywords
+    if any(_BLOCK_RE.search(e.get("message") or "") for e in js_result.get("errors", ())):
+        blocked_or_insufficient = True
+
+    # check content length
+    js_text_len = sections_text_len(js_result.get("sections", []))
+    if js_text_len < MIN_TEXT_LEN or len(js_result.get("sections", [])) == 0:
+        blocked_or_insufficient = True
+
+    if blocked_or_insufficient:
+        LOG.info("Escalating to full JS scrape (clicks+scroll+pagination, depth=3)")
+        # full mode: scrolls=5, clicks=5, pagination depth 3
+        js_result = await js_scrape_full(url, scrolls=5, clicks=5, pagination_limit=3)
+
+        # If still blocked or empty, try hard mode as last resort
+        js_text_len = sections_text_len(js_result.get("sections", []))
+        if js_text_len < MIN_TEXT_LEN or js_result.get("errors"):
+            LOG.info("Full JS scrape not sufficient or reported errors; attempting hard-scrape fallback")
+            js_result = await js_scrape_hard(url, max_scrolls=8)
+
+    return js_result
+
+
+# -----------------------
+# Lifecycle
+# -----------------------
+@app.on_event("startup")
+async def start_browser():
+    """Warm up the shared Chromium; each JS scrape gets its own context on it."""
+    try:
+        await BROWSER_POOL.get_browser()
+    except Exception:
+        LOG.exception("Failed to launch shared Playwright browser; will retry on first JS scrape")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_client()
+    _PARSE_POOL.shutdown(wait=False, cancel_futures=True)
+    shutdown_process_pool()
+    shutdown_parse_pool()
+    await BROWSER_POOL.shutdown()
+
+
 # -----------------------
 # Health
 # -----------------------
@@ -43,31 +238,26 @@ def healthz():
 # -----------------------
 # Scrape endpoint
 # -----------------------
-@app.post("/scrape")
-def scrape_endpoint(body: Dict[str, Any]):
+def is_supported_url(url: Any) -> bool:
+    return isinstance(url, str) and urlparse(url).scheme in ("http", "https")
+
+
+async def scrape_one(url: str) -> Tuple[Dict[str, Any], str]:
     """
-    POST /scrape
-    body: { "url": "https://example.com" }
+    Run the full scrape pipeline for one validated URL.
+    Returns (result, cache_status) where cache_status is "HIT" or "MISS".
     """
-    url = body.get("url") if isinstance(body, dict) else None
-    if not url:
-        raise HTTPException(status_code=400, detail="Missing 'url' field")
-
-    parsed = urlparse(url)
-    if parsed.scheme not in ("http", "https"):
-        return JSONResponse(
-            status_code=400,
-            content={
-                "success": False,
-                "error": "Only HTTP/HTTPS URLs are supported",
-                "errors": [error_obj("Unsupported URL scheme", "validation")],
-            },
-        )
+    cache_key = normalize_url(url)
+    cached = _CACHE.get(cache_key)
+    if cached is None:
+        cached = _NEG_CACHE.get(cache_key)
+    if cached is not None:
+        return cached, "HIT"
 
     result = {
         "url": url,
-        "scrapedAt": datetime.now(timezone.utc).isoformat(),
-        "meta": {"title": "", "description": "", "language": "", "canonical": None},
+        "scrapedAt": now_iso(),
+        "meta": dict(_META_EMPTY),
         "sections": [],
         "interactions": {"clicks": [], "scrolls": 0, "pages": [url]},
         "errors": [],
@@ -78,7 +268,7 @@ def scrape_endpoint(body: Dict[str, Any]):
     # -----------------------
     text = ""
     try:
-        text, status_code, headers = static_scrape(url)
+        text, status_code, headers = await static_scrape(url)
     except Exception as e:
         LOG.exception("static_scrape failed")
         result["errors"].append(error_obj(f"Static fetch failed: {str(e)}", "fetch"))
@@ -88,86 +278,33 @@ def scrape_endpoint(body: Dict[str, Any]):
         result["errors"].append(error_obj("Static fetch returned empty body", "fetch"))
 
     # -----------------------
-    # 2) PARSE STATIC HTML
+    # 2) PARSE STATIC HTML (nothing to parse on an empty body; go straight to JS)
     # -----------------------
-    try:
-        soup = BeautifulSoup(text or "<html></html>", "lxml")
-
-        title_tag = soup.find("title")
-        og_title = soup.find("meta", property="og:title")
-        meta_title = (og_title and og_title.get("content")) or (title_tag.text if title_tag else "")
-
-        desc_tag = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", property="og:description")
-        description = desc_tag.get("content", "") if desc_tag else ""
-
-        lang = ""
-        html_tag = soup.find("html")
-        if html_tag and html_tag.get("lang"):
-            lang = html_tag.get("lang")
-
-        canonical = None
-        can_tag = soup.find("link", rel="canonical")
-        if can_tag and can_tag.get("href"):
-            canonical = make_absolute_url(url, can_tag.get("href"))
-
-        result["meta"].update({
-            "title": meta_title,
-            "description": description,
-            "language": lang or "",
-            "canonical": canonical
-        })
-
-        # Extract sections
-        try:
-            sections = parse_sections_from_soup(soup, source_url=url)
-            result["sections"].extend(sections)
-        except Exception as e:
-            LOG.exception("parse_sections_from_soup failed")
-            result["errors"].append(error_obj(f"Section parsing failed: {str(e)}", "parse"))
-
-    except Exception as e:
-        LOG.exception("HTML parse error")
-        result["errors"].append(error_obj(f"HTML parse error: {str(e)}", "parse"))
+    running_text_len = 0
+    app_shell = False
+    # Bound worst-case parse time/RSS (a parsed tree is several times the HTML size)
+    text, truncated = truncate_at_tag(text, MAX_HTML_CHARS)
+    if truncated:
+        result["errors"].append(error_obj(f"HTML truncated to {MAX_HTML_CHARS} characters before parsing", "parse"))
+
+    if text:
+        meta, sections, parse_errors, app_shell = await run_in_pool(_PARSE_POOL, parse_static_html, text, url)
+        result["meta"].update(meta)
+        result["sections"].extend(sections)
+        running_text_len = sections_text_len(sections)
+        result["errors"].extend(parse_errors)
 
     # -----------------------
     # 3) JS SCRAPE FALLBACK (normal -> full -> hard)
     # -----------------------
-    total_text_len = sum(len(s.get("content", {}).get("text", "")) for s in result["sections"])
+    static_ok = running_text_len >= STATIC_OK_TEXT and len(result["sections"]) >= STATIC_OK_SECTIONS
+    # An empty SPA mount point means the visible content is rendered client-side
+    needs_js = running_text_len < MIN_TEXT_LEN or len(result["sections"]) == 0 or app_shell
 
-    if total_text_len < 300 or len(result["sections"]) == 0:
+    if needs_js and not static_ok:
         js_result = None
         try:
-            # Try lightweight JS render first
-            js_result = js_scrape_with_playwright(url, max_scrolls=3)
-
-            # If this returned no useful content, or errors indicate blocking,
-            # escalate to the full JS engine which performs clicks/scrolls/pagination
-            blocked_or_insufficient = False
-
-            # check for blocking keywords
-            if js_result.get("errors"):
-                for e in js_result.get("errors", []):
-                    msg = e.get("message", "").lower()
-                    if "403" in msg or "blocked" in msg or "access denied" in msg:
-                        blocked_or_insufficient = True
-                        break
-
-            # check content length
-            js_text_len = sum(len(s.get("content", {}).get("text", "")) for s in js_result.get("sections", []))
-            if js_text_len < 300 or len(js_result.get("sections", [])) == 0:
-                blocked_or_insufficient = True
-
-            if blocked_or_insufficient:
-                LOG.info("Escalating to full JS scrape (clicks+scroll+pagination, depth=3)")
-                # full mode: scrolls=5, clicks=5, pagination_depth=3, headless=False to mimic real user
-                js_result = js_scrape_full(url, scrolls=5, clicks=5, pagination_depth=3, headless=False)
-
-                # If still blocked or empty, try hard mode as last resort
-                js_text_len = sum(len(s.get("content", {}).get("text", "")) for s in js_result.get("sections", []))
-                if js_text_len < 300 or js_result.get("errors"):
-                    LOG.info("Full JS scrape not sufficient or reported errors; attempting hard-scrape fallback")
-                    js_result = js_scrape_hard(url, max_scrolls=8, headless=False)
-
+            js_result = await run_js_ladder(url)
         except Exception as e:
             LOG.exception("Playwright run failed")
             js_result = {
@@ -185,25 +322,29 @@ def scrape_endpoint(body: Dict[str, Any]):
                     if v and not result["meta"].get(k):
                         result["meta"][k] = v
 
-                # Merge sections: avoid duplicates by short rawHtml snippet
-                existing_raw = { (s.get("rawHtml") or "")[:200] for s in result["sections"] }
+                # Merge sections: avoid duplicates by a hash of the full rawHtml
+                existing_raw = {raw_html_key(s) for s in result["sections"]}
                 for sec in js_result.get("sections", []):
-                    raw_snip = (sec.get("rawHtml") or "")[:200]
-                    if raw_snip not in existing_raw:
+                    h = raw_html_key(sec)
+                    if h not in existing_raw:
                         result["sections"].append(sec)
-                        existing_raw.add(raw_snip)
+                        existing_raw.add(h)
 
                 # Merge interactions
                 result["interactions"]["clicks"].extend(js_result.get("interactions", {}).get("clicks", []))
                 result["interactions"]["scrolls"] += js_result.get("interactions", {}).get("scrolls", 0)
 
+                pages_seen = set(result["interactions"]["pages"])
                 for p in js_result.get("interactions", {}).get("pages", []):
-                    if p not in result["interactions"]["pages"]:
+                    if p not in pages_seen:
+                        pages_seen.add(p)
                         result["interactions"]["pages"].append(p)
 
-                # Merge errors
+                # Merge errors (and non-fatal warnings such as HTML truncation)
                 for e in js_result.get("errors", []):
                     result["errors"].append(e)
+                for w in js_result.get("warnings", []):
+                    result["errors"].append(w)
 
         except Exception as e:
             LOG.exception("Merging js_result failed")
@@ -213,18 +354,99 @@ def scrape_endpoint(body: Dict[str, Any]):
     # 4) ENSURE MINIMUM OUTPUT
     # -----------------------
     if not result["sections"]:
-        result["sections"].append({
-            "id": "page-0",
-            "type": "unknown",
-            "label": "Page content",
-            "sourceUrl": url,
-            "content": {"headings": [], "text": "", "links": [], "images": [], "lists": [], "tables": []},
-            "rawHtml": "",
-            "truncated": True,
-        })
+        result["sections"].append(Section(
+            id="page-0",
+            type="unknown",
+            label="Page content",
+            sourceUrl=url,
+            content=SectionContent(),
+            rawHtml="",
+            truncated=True,
+        ))
         result["errors"].append(error_obj("No readable content found in static or JS mode", "fallback"))
+        _NEG_CACHE[cache_key] = result
+    else:
+        _CACHE[cache_key] = result
+
+    return result, "MISS"
+
+
+@app.post("/scrape")
+async def scrape_endpoint(body: Dict[str, Any], request: Request):
+    """
+    POST /scrape
+    body: { "url": "https://example.com" }
+    """
+    url = body.get("url") if isinstance(body, dict) else None
+    if not url or not isinstance(url, str):
+        raise HTTPException(status_code=400, detail="Missing 'url' field")
+
+    if not is_supported_url(url):
+        return ORJSONResponse(status_code=400, content=_UNSUPPORTED_SCHEME)
+
+    result, cache_status = await scrape_one(url)
+    return result_response(result, request, cache_status)
+
+
+@app.post("/scrape_stream")
+async def scrape_stream_endpoint(body: Dict[str, Any]):
+    """
+    POST /scrape_stream
+    body: { "url": "https://example.com" }
+
+    Same pipeline as /scrape, returned as NDJSON (see ndjson_lines) so large
+    pages are never held as a single JSON body.
+    """
+    url = body.get("url") if isinstance(body, dict) else None
+    if not url or not isinstance(url, str):
+        raise HTTPException(status_code=400, detail="Missing 'url' field")
+
+    if not is_supported_url(url):
+        return ORJSONResponse(status_code=400, content=_UNSUPPORTED_SCHEME)
+
+    result, cache_status = await scrape_one(url)
+    return StreamingResponse(
+        ndjson_lines(result), media_type="application/x-ndjson", headers={"X-Cache": cache_status}
+    )
 
-    return JSONResponse(status_code=200, content={"result": result})
+
+@app.post("/scrape_batch")
+async def scrape_batch_endpoint(body: Dict[str, Any]):
+    """
+    POST /scrape_batch
+    body: { "urls": ["https://example.com", ...] }
+
+    URLs are scraped concurrently (at most BATCH_CONCURRENCY at a time);
+    results come back in request order. Per-URL failures are reported
+    inline instead of failing the whole batch.
+    """
+    urls = body.get("urls") if isinstance(body, dict) else None
+    if not urls or not isinstance(urls, list):
+        raise HTTPException(status_code=400, detail="Missing 'urls' field")
+    if len(urls) > BATCH_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_URLS} URLs per batch")
+
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def one(u):
+        if not is_supported_url(u):
+            return {"url": u, **_UNSUPPORTED_SCHEME}
+        async with sem:
+            result, _ = await scrape_one(u)
+        return result
+
+    results = await asyncio.gather(*(one(u) for u in urls), return_exceptions=True)
+    for i, r in enumerate(results):
+        if isinstance(r, Exception):
+            LOG.error("Batch scrape of %s failed: %s", urls[i], r)
+            results[i] = {
+                "url": urls[i],
+                "success": False,
+                "error": str(r),
+                "errors": [error_obj(f"Scrape failed: {str(r)}", "fallback")],
+            }
+
+    return ORJSONResponse(status_code=200, content={"results": results})
 
 
 # -----------------------
@@ -235,219 +457,24 @@ frontend_dist = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fronte
 if os.path.isdir(frontend_dist):
     app.mount("/", StaticFiles(directory=frontend_dist, html=True), name="frontend")
 else:
-    @app.get("/", response_class=JSONResponse)
+    @app.get("/", response_class=ORJSONResponse)
     def root_info():
         return {"message": "Frontend not built. Run: npm run build", "api": "/scrape"}
 
 
-
-# import json
-# import logging
-# import os
-# from datetime import datetime, timezone
-# from typing import Any, Dict
-# from urllib.parse import urlparse
-
-# from fastapi import FastAPI, HTTPException
-# from fastapi.responses import JSONResponse
-# from fastapi.staticfiles import StaticFiles
-# from bs4 import BeautifulSoup
-
-# # Import from modular scraper package
-# from backend.scraper.static_fetch import static_scrape
-# from backend.scraper.playwright_scraper import js_scrape_with_playwright, js_scrape_hard
-# from backend.scraper.parsers.sections import parse_sections_from_soup
-# from backend.scraper.utils import make_absolute_url
-
-# LOG = logging.getLogger("uvicorn.error")
-
-# app = FastAPI(title="Lyftr Scraper (backend)")
-
-
-# # -----------------------
-# # Helpers
-# # -----------------------
-# def error_obj(message: str, phase: str):
-#     return {"message": message, "phase": phase}
-
-
-# # -----------------------
-# # Health
-# # -----------------------
-# @app.get("/healthz")
-# def healthz():
-#     return {"status": "ok"}
-
-
-# # -----------------------
-# # Scrape endpoint
-# # -----------------------
-# @app.post("/scrape")
-# def scrape_endpoint(body: Dict[str, Any]):
-#     """
-#     POST /scrape
-#     body: { "url": "https://example.com" }
-#     """
-#     url = body.get("url") if isinstance(body, dict) else None
-#     if not url:
-#         raise HTTPException(status_code=400, detail="Missing 'url' field")
-
-#     parsed = urlparse(url)
-#     if parsed.scheme not in ("http", "https"):
-#         return JSONResponse(
-#             status_code=400,
-#             content={
-#                 "success": False,
-#                 "error": "Only HTTP/HTTPS URLs are supported",
-#                 "errors": [error_obj("Unsupported URL scheme", "validation")],
-#             },
-#         )
-
-#     result = {
-#         "url": url,
-#         "scrapedAt": datetime.now(timezone.utc).isoformat(),
-#         "meta": {"title": "", "description": "", "language": "", "canonical": None},
-#         "sections": [],
-#         "interactions": {"clicks": [], "scrolls": 0, "pages": [url]},
-#         "errors": [],
-#     }
-
-#     # -----------------------
-#     # 1) STATIC SCRAPE
-#     # -----------------------
-#     text = ""
-#     try:
-#         text, status_code, headers = static_scrape(url)
-#     except Exception as e:
-#         LOG.exception("static_scrape failed")
-#         result["errors"].append(error_obj(f"Static fetch failed: {str(e)}", "fetch"))
-#         text = ""
-
-#     if not text:
-#         result["errors"].append(error_obj("Static fetch returned empty body", "fetch"))
-
-#     # -----------------------
-#     # 2) PARSE STATIC HTML
-#     # -----------------------
-#     try:
-#         soup = BeautifulSoup(text or "<html></html>", "lxml")
-
-#         title_tag = soup.find("title")
-#         og_title = soup.find("meta", property="og:title")
-#         meta_title = (og_title and og_title.get("content")) or (title_tag.text if title_tag else "")
-
-#         desc_tag = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", property="og:description")
-#         description = desc_tag.get("content", "") if desc_tag else ""
-
-#         lang = ""
-#         html_tag = soup.find("html")
-#         if html_tag and html_tag.get("lang"):
-#             lang = html_tag.get("lang")
-
-#         canonical = None
-#         can_tag = soup.find("link", rel="canonical")
-#         if can_tag and can_tag.get("href"):
-#             canonical = make_absolute_url(url, can_tag.get("href"))
-
-#         result["meta"].update({
-#             "title": meta_title,
-#             "description": description,
-#             "language": lang or "",
-#             "canonical": canonical
-#         })
-
-#         # Extract sections
-#         try:
-#             sections = parse_sections_from_soup(soup, source_url=url)
-#             result["sections"].extend(sections)
-#         except Exception as e:
-#             LOG.exception("parse_sections_from_soup failed")
-#             result["errors"].append(error_obj(f"Section parsing failed: {str(e)}", "parse"))
-
-#     except Exception as e:
-#         LOG.exception("HTML parse error")
-#         result["errors"].append(error_obj(f"HTML parse error: {str(e)}", "parse"))
-
-#     # -----------------------
-#     # 3) JS SCRAPE FALLBACK
-#     # -----------------------
-#     total_text_len = sum(len(s.get("content", {}).get("text", "")) for s in result["sections"])
-
-#     if total_text_len < 300 or len(result["sections"]) == 0:
-#         try:
-#             js_result = js_scrape_with_playwright(url, max_scrolls=3)
-
-#             # If blocked → use HARD MODE
-#             if js_result.get("errors") and any(
-#                 "403" in e.get("message", "") or "blocked" in e.get("message", "").lower()
-#                 for e in js_result.get("errors", [])
-#             ):
-#                 LOG.info("Site blocking detected. Using hard-scrape mode")
-#                 js_result = js_scrape_hard(url, max_scrolls=8, headless=False)
-
-#         except Exception as e:
-#             LOG.exception("Playwright normal flow failed")
-#             js_result = {
-#                 "sections": [],
-#                 "meta": {},
-#                 "interactions": {"clicks": [], "scrolls": 0, "pages": []},
-#                 "errors": [{"phase": "render", "message": str(e)}],
-#             }
-
-#         # Merge JS results
-#         try:
-#             # Merge meta
-#             for k, v in js_result.get("meta", {}).items():
-#                 if v and not result["meta"].get(k):
-#                     result["meta"][k] = v
-
-#             # Merge sections (avoid duplicates)
-#             existing_raw = {s.get("rawHtml")[:200] for s in result["sections"]}
-#             for sec in js_result.get("sections", []):
-#                 if sec.get("rawHtml", "")[:200] not in existing_raw:
-#                     result["sections"].append(sec)
-
-#             # Merge interactions
-#             result["interactions"]["clicks"].extend(js_result["interactions"].get("clicks", []))
-#             result["interactions"]["scrolls"] += js_result["interactions"].get("scrolls", 0)
-
-#             for p in js_result["interactions"].get("pages", []):
-#                 if p not in result["interactions"]["pages"]:
-#                     result["interactions"]["pages"].append(p)
-
-#             result["errors"].extend(js_result.get("errors", []))
-
-#         except Exception as e:
-#             LOG.exception("Merging js_result failed")
-#             result["errors"].append(error_obj(f"Merging JS result failed: {str(e)}", "render"))
-
-#     # -----------------------
-#     # 4) ENSURE MINIMUM OUTPUT
-#     # -----------------------
-#     if not result["sections"]:
-#         result["sections"].append({
-#             "id": "page-0",
-#             "type": "unknown",
-#             "label": "Page content",
-#             "sourceUrl": url,
-#             "content": {"headings": [], "text": "", "links": [], "images": [], "lists": [], "tables": []},
-#             "rawHtml": "",
-#             "truncated": True,
-#         })
-#         result["errors"].append(error_obj("No readable content found in static or JS mode", "fallback"))
-
-#     return JSONResponse(status_code=200, content={"result": result})
-
-
-# # -----------------------
-# # Serve frontend build
-# # -----------------------
-# frontend_dist = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "dist")
-
-# if os.path.isdir(frontend_dist):
-#     app.mount("/", StaticFiles(directory=frontend_dist, html=True), name="frontend")
-# else:
-#     @app.get("/", response_class=JSONResponse)
-#     def root_info():
-#         return {"message": "Frontend not built. Run: npm run build", "api": "/scrape"}
-
+# -----------------------
+# Direct launch: python -m backend.main
+# -----------------------
+if __name__ == "__main__":
+    import sys
+    import uvicorn
+
+    # uvloop/httptools ship with uvicorn[standard]; uvloop has no Windows build.
+    uvicorn.run(
+        "backend.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        loop="auto" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
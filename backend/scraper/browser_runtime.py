@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import re
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from playwright.async_api import Browser, BrowserContext, Page, Playwright, Request, async_playwright
+
+from backend.scraper.context_pool import ContextPool
+
+LOG = logging.getLogger(__name__)
+LOG.addHandler(logging.NullHandler())
+
+# Launch args for the shared browser.
+BROWSER_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+]
+
+# The shared browser renders arbitrary user-supplied URLs, so Chromium's
+# sandbox stays on unless explicitly disabled (needed when running as root,
+# e.g. in some Docker images).
+if os.getenv("SCRAPER_CHROMIUM_NO_SANDBOX", "").lower() in ("1", "true", "yes"):
+    BROWSER_ARGS.append("--no-sandbox")
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/125 Safari/537.36"
+
+# Resource types never needed for section extraction (<img src> is read from
+# the HTML, not the network), so their requests are aborted.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+# Analytics / ad / tracking hosts: their scripts never produce content.
+BLOCKED_URL_RE = re.compile(
+    r"^https?://([^/]+\.)?("
+    r"google-analytics\.com|googletagmanager\.com|doubleclick\.net|googlesyndication\.com"
+    r"|hotjar\.com|facebook\.net|connect\.facebook\.com|segment\.(com|io)|cdn\.segment\.com"
+    r")[/:]",
+    re.IGNORECASE,
+)
+
+
+# -------------------------------------------------
+# Stealth Mode
+# -------------------------------------------------
+# Installed once per context (see _setup_context) and run in every page of it.
+_STEALTH_JS = """
+Object.defineProperty(navigator, 'webdriver', { get: () => false });
+Object.defineProperty(navigator, 'languages', { get: () => ['en-US','en'] });
+Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
+window.chrome = window.chrome || { runtime: {} };
+"""
+
+
+# -------------------------------------------------
+# Request Blocking
+# -------------------------------------------------
+async def _block_heavy_resources(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_RE.match(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# -------------------------------------------------
+# Network Quiet Detection
+# -------------------------------------------------
+# Requests currently in flight per page, kept by the context-level listeners
+# installed in _setup_context. Aborted (blocked) requests count as failed.
+_INFLIGHT: Dict[Page, int] = {}
+
+
+def _request_page(request: Request) -> Optional[Page]:
+    try:
+        return request.frame.page
+    except Exception:
+        # service worker / detached frame: not attributable to a page
+        return None
+
+
+def _on_request(request: Request):
+    page = _request_page(request)
+    if page is not None:
+        _INFLIGHT[page] = _INFLIGHT.get(page, 0) + 1
+
+
+def _on_request_done(request: Request):
+    page = _request_page(request)
+    if page is not None and _INFLIGHT.get(page):
+        _INFLIGHT[page] -= 1
+
+
+def _on_page(page: Page):
+    page.on("close", lambda p: _INFLIGHT.pop(p, None))
+
+
+async def wait_for_quiet(page: Page, quiet_ms: int = 300, timeout_ms: int = 8000) -> bool:
+    """
+    Wait until `page` has had no requests in flight for `quiet_ms`, or until
+    `timeout_ms` passes. Unlike networkidle (500ms of zero connections, which
+    ad/polling-heavy pages rarely reach), a timeout here is cheap and
+    bounded. Returns False on timeout.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_ms / 1000
+    quiet_since = None
+    while True:
+        now = loop.time()
+        if _INFLIGHT.get(page, 0) == 0:
+            if quiet_since is None:
+                quiet_since = now
+            elif now - quiet_since >= quiet_ms / 1000:
+                return True
+        else:
+            quiet_since = None
+        if now >= deadline:
+            return False
+        await asyncio.sleep(0.05)
+
+
+async def _setup_context(context: BrowserContext):
+    # Registered once per context, so they live and die with the context
+    # rather than being re-added (and leaked / re-sent) on every page.
+    await context.route("**/*", _block_heavy_resources)
+    await context.add_init_script(_STEALTH_JS)
+    context.on("page", _on_page)
+    context.on("request", _on_request)
+    context.on("requestfinished", _on_request_done)
+    context.on("requestfailed", _on_request_done)
+
+
+# -------------------------------------------------
+# Browser Pool
+# -------------------------------------------------
+class BrowserPool:
+    """
+    One lazily-launched, shared Chromium. Each scrape gets a page in a warm,
+    recycled BrowserContext (see ContextPool) instead of a cold browser
+    launch (~1-2s). If the browser dies it is relaunched on next use.
+    """
+
+    def __init__(
+        self,
+        max_contexts: int = 8,
+        headless: bool = True,
+        max_context_uses: int = 50,
+        max_context_age: float = 300.0,
+    ):
+        self.headless = headless
+        self._pw: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._lock = asyncio.Lock()
+        # Warm, recycled contexts; also caps how many are open at once.
+        self.contexts = ContextPool(
+            self.get_browser,
+            size=max_contexts,
+            max_uses=max_context_uses,
+            max_age=max_context_age,
+            setup=_setup_context,
+            user_agent=USER_AGENT,
+            viewport={"width": 1366, "height": 768},
+            locale="en-US",
+            # service workers keep fetching/caching in the background of a
+            # recycled context and can bypass the route-based blocking
+            service_workers="block",
+        )
+
+    async def get_browser(self) -> Browser:
+        if self._browser is None or not self._browser.is_connected():
+            async with self._lock:
+                if self._browser is None or not self._browser.is_connected():
+                    if self._pw is None:
+                        self._pw = await async_playwright().start()
+                    self._browser = await self._pw.chromium.launch(headless=self.headless, args=BROWSER_ARGS)
+        return self._browser
+
+    @asynccontextmanager
+    async def page(self, viewport_height: int = 768):
+        """
+        Yield a blank page in a pooled BrowserContext on the shared browser.
+        The page stays with its context for reuse; a scrape that raises
+        retires the context, page included.
+        """
+        async with self.contexts.context() as context:
+            page = await self.contexts.page(context)
+            size = page.viewport_size
+            if size is None or size["height"] != viewport_height:
+                await page.set_viewport_size({"width": 1366, "height": viewport_height})
+            yield page
+
+    async def shutdown(self):
+        await self.contexts.close()
+        async with self._lock:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    LOG.exception("Closing shared browser failed")
+                self._browser = None
+            if self._pw is not None:
+                await self._pw.stop()
+                self._pw = None
+
+
+BROWSER_POOL = BrowserPool(
+    max_contexts=int(os.getenv("SCRAPER_MAX_CONTEXTS", "8")),
+    max_context_uses=int(os.getenv("SCRAPER_CONTEXT_MAX_USES", "50")),
+    max_context_age=float(os.getenv("SCRAPER_CONTEXT_MAX_AGE", "300")),
+)
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from playwright.async_api import Browser, BrowserContext, Frame, Page
+
+LOG = logging.getLogger(__name__)
+LOG.addHandler(logging.NullHandler())
+
+
+
+class ContextPool:
+    """
+    Bounded pool of warm BrowserContexts on a shared browser.
+
+    A scrape borrows a context instead of creating one, and hands it back
+    afterwards reset: the kept page is taken to about:blank first (so the
+    scraped site's scripts stop before anything is cleared), then cookies
+    are cleared, and all storage (local/session storage, IndexedDB, Cache
+    Storage, service workers) of every origin its frames visited is wiped
+    over CDP. Only the HTTP cache carries over. A context that opened extra
+    pages (popups, target=_blank tabs) is retired instead. Long-lived
+    contexts accumulate memory, so a context is retired (closed, and lazily
+    replaced on a later acquire) once it has served `max_uses` scrapes or
+    is older than `max_age` seconds. At most `size` contexts are checked out
+    at once. `setup` runs once on each new context (routes, init scripts).
+
+    Each context also keeps the page it last served (see `page()`); the
+    reset above leaves it on about:blank while idle, so a pooled context
+    runs no site JS or network traffic between scrapes.
+    """
+
+    def __init__(
+        self,
+        get_browser: Callable[[], Awaitable[Browser]],
+        size: int = 8,
+        max_uses: int = 50,
+        max_age: float = 300.0,
+        setup: Optional[Callable[[BrowserContext], Awaitable[None]]] = None,
+        **context_options: Any,
+    ):
+        self._get_browser = get_browser
+        self._setup = setup
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self._options: Dict[str, Any] = context_options
+        self._slots = asyncio.Semaphore(size)
+        # Idle contexts: (context, uses, created_at)
+        self._idle: Deque[Tuple[BrowserContext, int, float]] = deque()
+        # Checked-out contexts -> (uses, created_at)
+        self._busy: Dict[BrowserContext, Tuple[int, float]] = {}
+        # Context -> its reusable page
+        self._pages: Dict[BrowserContext, Page] = {}
+        # Context -> origins its page's frames navigated to since the last reset
+        self._origins: Dict[BrowserContext, Set[str]] = {}
+        self._closed = False
+        # Serializes new_context() so concurrent acquires don't race the browser launch
+        self._create_lock = asyncio.Lock()
+
+    def _expired(self, context: BrowserContext, uses: int, created_at: float) -> bool:
+        return (
+            uses >= self.max_uses
+            or time.monotonic() - created_at > self.max_age
+            or not context.browser.is_connected()
+        )
+
+    async def _close_page(self, page: Page):
+        try:
+            await page.close()
+        except Exception:
+            LOG.debug("Closing pooled page failed", exc_info=True)
+
+    async def _retire(self, context: BrowserContext):
+        self._origins.pop(context, None)
+        page = self._pages.pop(context, None)
+        if page is not None:
+            await self._close_page(page)
+        try:
+            await context.close()
+        except Exception:
+            LOG.debug("Closing retired context failed", exc_info=True)
+
+    async def acquire(self) -> BrowserContext:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                context, uses, created_at = self._idle.popleft()
+                if not self._expired(context, uses, created_at):
+                    self._busy[context] = (uses, created_at)
+                    return context
+                await self._retire(context)
+
+            async with self._create_lock:
+                browser = await self._get_browser()
+                context = await browser.new_context(**self._options)
+            if self._setup is not None:
+                try:
+                    await self._setup(context)
+                except BaseException:
+                    await self._retire(context)
+                    raise
+            self._busy[context] = (0, time.monotonic())
+            return context
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _reset(self, context: BrowserContext) -> bool:
+        """Ready a context for its next borrower; False if it must be retired instead."""
+        kept = self._pages.get(context)
+        if any(p is not kept for p in context.pages):
+            # Pages opened by clicks keep loading (and hold memory) in the
+            # background; closing the context is the only clean reset.
+            return False
+        if kept is not None and not kept.is_closed():
+            # Leave the site first: its timers, polling and late responses
+            # could otherwise write cookies/storage back after clearing.
+            await kept.goto("about:blank")
+            origins = self._origins.pop(context, None)
+            if origins:
+                cdp = await context.new_cdp_session(kept)
+                try:
+                    await cdp.send("DOMStorage.enable")
+                    for origin in origins:
+                        await cdp.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+                        # sessionStorage is per tab and not among "all"
+                        await cdp.send(
+                            "DOMStorage.clear", {"storageId": {"securityOrigin": origin, "isLocalStorage": False}}
+                        )
+                finally:
+                    await cdp.detach()
+        await context.clear_cookies()
+        return True
+
+    async def release(self, context: BrowserContext, healthy: bool = True):
+        try:
+            uses, created_at = self._busy.pop(context)
+            uses += 1
+            if healthy and not self._closed and not self._expired(context, uses, created_at):
+                try:
+                    if await self._reset(context):
+                        self._idle.append((context, uses, created_at))
+                        return
+                except Exception:
+                    LOG.debug("Resetting context failed; retiring it", exc_info=True)
+            await self._retire(context)
+        finally:
+            self._slots.release()
+
+    async def page(self, context: BrowserContext) -> Page:
+        """
+        A page in a borrowed `context`: the one from its previous use
+        (already on about:blank, see `_reset`), or a new one on first use.
+        """
+        page = self._pages.get(context)
+        if page is not None and not page.is_closed():
+            return page
+        page = await context.new_page()
+
+        def on_navigated(frame: Frame):
+            parts = urlsplit(frame.url)
+            if parts.scheme in ("http", "https"):
+                self._origins.setdefault(context, set()).add(f"{parts.scheme}://{parts.netloc}")
+
+        page.on("framenavigated", on_navigated)
+        self._pages[context] = page
+        return page
+
+    @asynccontextmanager
+    async def context(self):
+        """Borrow a context for the duration of the block."""
+        context = await self.acquire()
+        healthy = False
+        try:
+            yield context
+            healthy = True
+        finally:
+            await self.release(context, healthy=healthy)
+
+    async def close(self):
+        """Close every idle context; busy ones are closed on release."""
+        self._closed = True
+        while self._idle:
+            context, _, _ = self._idle.popleft()
+            await self._retire(context)
@@ -0,0 +1,40 @@
+import asyncio
+import httpx
+from typing import Optional
+
+DEFAULT_HEADERS = {"User-Agent": "Lyftr-Assignment-Bot/1.0"}
+
+# Shared keep-alive pool: repeated hosts skip the TCP+TLS handshake, and
+# HTTP/2 multiplexes concurrent requests to one origin over one connection.
+# Created lazily on first use so it binds to the running event loop; the
+# app must await close_client() at shutdown.
+_CLIENT: Optional[httpx.AsyncClient] = None
+_CLIENT_LOCK = asyncio.Lock()
+
+
+def new_client() -> httpx.AsyncClient:
+    """A client with the shared pool settings (HTTP/2, keep-alive limits, timeouts)."""
+    return httpx.AsyncClient(
+        http2=True,
+        headers=DEFAULT_HEADERS,
+        timeout=httpx.Timeout(12.0, connect=5.0),
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+    )
+
+
+async def get_client() -> httpx.AsyncClient:
+    global _CLIENT
+    if _CLIENT is None:
+        async with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = new_client()
+    return _CLIENT
+
+
+async def close_client():
+    """Close the shared client's connections; the next fetch opens a new one."""
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
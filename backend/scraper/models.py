@@ -0,0 +1,47 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+
+# Field names follow the JSON response shape (camelCase included), so
+# orjson can serialize these directly without a to_dict() round-trip.
+@dataclass(slots=True)
+class SectionContent:
+    headings: List[str] = field(default_factory=list)
+    text: str = ""
+    links: List[Dict[str, str]] = field(default_factory=list)
+    images: List[Dict[str, str]] = field(default_factory=list)
+    lists: List[List[str]] = field(default_factory=list)
+    tables: List[Any] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "headings": self.headings,
+            "text": self.text,
+            "links": self.links,
+            "images": self.images,
+            "lists": self.lists,
+            "tables": self.tables,
+        }
+
+
+@dataclass(slots=True)
+class Section:
+    id: str
+    type: str
+    label: str
+    sourceUrl: str
+    content: SectionContent
+    rawHtml: str
+    truncated: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Legacy nested-dict shape of the section."""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "label": self.label,
+            "sourceUrl": self.sourceUrl,
+            "content": self.content.to_dict(),
+            "rawHtml": self.rawHtml,
+            "truncated": self.truncated,
+        }
@@ -0,0 +1,43 @@
+import asyncio
+import os
+from typing import Any, Dict
+
+from backend.scraper.parsers import sections as _sections
+from backend.scraper.process_pool import SpawnPool
+from backend.scraper.utils import extract_page_meta, parse_html
+
+# Rendered pages are parsed in worker processes (SCRAPER_RENDER_PARSE_PROCESSES
+# of them, default half the cores; 0 parses on a thread instead) so N
+# concurrent renders parse in parallel instead of queueing on the GIL.
+# The HTML is pickled over to the worker, which is why the scrapers cap it
+# (MAX_RENDERED_HTML) first.
+RENDER_PARSE_PROCESSES = int(os.getenv("SCRAPER_RENDER_PARSE_PROCESSES", str((os.cpu_count() or 1) // 2)))
+
+
+def _init_worker():
+    # A worker already is the parallelism; don't let it start its own
+    # landmark pool (see parsers.sections) on top.
+    _sections.PARSE_PROCESSES = 0
+
+
+_PARSE_POOL = SpawnPool(max_workers=max(RENDER_PARSE_PROCESSES, 1), initializer=_init_worker)
+
+
+def shutdown_parse_pool():
+    _PARSE_POOL.shutdown()
+
+
+def parse_page(html: str, url: str, with_meta: bool = True) -> Dict[str, Any]:
+    """Parse rendered HTML into {"meta": ..., "sections": [...]}; top-level so it pickles."""
+    root = parse_html(html)
+    return {
+        "meta": extract_page_meta(root, url) if with_meta else {},
+        "sections": _sections.parse_sections_from_soup(root, source_url=url, html=html),
+    }
+
+
+async def parse_page_async(html: str, url: str, with_meta: bool = True) -> Dict[str, Any]:
+    """parse_page off the event loop: in the process pool, or on a thread when it is disabled."""
+    if RENDER_PARSE_PROCESSES <= 0:
+        return await asyncio.to_thread(parse_page, html, url, with_meta)
+    return await _PARSE_POOL.run(parse_page, html, url, with_meta)
@@ -0,0 +1,91 @@
+from typing import List, Dict, Any
+from lxml import etree
+from lxml.html import HtmlElement
+
+from backend.scraper.parsers.images import image_entry
+from backend.scraper.utils import make_url_joiner
+
+_HEADING_TAGS = frozenset(("h1", "h2", "h3"))
+_LIST_TAGS = frozenset(("ul", "ol"))
+
+
+def _join(parts: List[str]) -> str:
+    return " ".join(t for t in (p.strip() for p in parts) if t)
+
+
+def extract_all(el: HtmlElement, base_url: str) -> Dict[str, Any]:
+    """
+    Headings, text, links, images and lists of a landmark in a single
+    iterwalk over its subtree, instead of one traversal per extractor.
+
+    Text matches utils.node_text; images go through images.image_entry.
+    Every text chunk (a node's .text or .tail) goes to all
+    collectors open at that point (the landmark itself plus any enclosing
+    heading, link or list item). Entries are reserved at the start event,
+    so results keep document order even when collectors are nested.
+    """
+    join = make_url_joiner(base_url)
+    text_parts: List[str] = []
+    headings: List[List[str]] = []
+    links: List[tuple] = []
+    images: List[Dict[str, str]] = []
+    lists: List[List[List[str]]] = []
+
+    open_parts: List[List[str]] = [text_parts]
+    open_lists: List[List[List[str]]] = []
+    # per open element: (text collector it opened, list it opened)
+    stack: List[tuple] = []
+
+    for event, node in etree.iterwalk(el, events=("start", "end", "comment", "pi")):
+        if event == "start":
+            parts = items = None
+            tag = node.tag
+            if isinstance(tag, str):
+                if tag in _HEADING_TAGS:
+                    parts = []
+                    headings.append(parts)
+                elif tag == "a" and node.get("href") is not None:
+                    parts = []
+                    links.append((node.get("href"), parts))
+                elif tag == "li" and open_lists and node.getparent().tag in _LIST_TAGS:
+                    # a direct child of the innermost open list, so only
+                    # that list gets the item
+                    parts = []
+                    open_lists[-1].append(parts)
+                elif tag in _LIST_TAGS:
+                    items = []
+                    lists.append(items)
+                    open_lists.append(items)
+                elif tag == "img":
+                    entry = image_entry(node, join)
+                    if entry:
+                        images.append(entry)
+
+                if parts is not None:
+                    open_parts.append(parts)
+                if node.text:
+                    for p in open_parts:
+                        p.append(node.text)
+            stack.append((parts, items))
+        elif event in ("comment", "pi"):
+            # skip the comment / PI content itself, keep the text after it
+            if node.tail:
+                for p in open_parts:
+                    p.append(node.tail)
+        else:
+            parts, items = stack.pop()
+            if parts is not None:
+                open_parts.pop()
+            if items is not None:
+                open_lists.pop()
+            if node is not el and node.tail:
+                for p in open_parts:
+                    p.append(node.tail)
+
+    return {
+        "headings": [_join(p) for p in headings[:5]],
+        "text": _join(text_parts),
+        "links": [{"text": _join(p), "href": join(href)} for href, p in links],
+        "images": images,
+        "lists": [[_join(p) for p in items] for items in lists if items],
+    }
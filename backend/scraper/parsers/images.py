@@ -1,27 +1,31 @@
 import re
-from typing import List, Dict
-from bs4 import BeautifulSoup
-from backend.scraper.utils import make_absolute_url
+from typing import Callable, Dict, Optional
+from lxml.html import HtmlElement
 
+_BG_URL_RE = re.compile(r'url\([\'"]?(.*?)[\'"]?\)')
 
-def extract_images(node: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
-    imgs = []
 
-    for img in node.find_all("img"):
-        src = img.get("src") or img.get("data-src") or img.get("data-lazy-src") or ""
+def image_entry(img: HtmlElement, join: Callable[[str], str]) -> Optional[Dict[str, str]]:
+    """
+    {"src", "alt"} for one <img>, or None when it has no usable source.
+    `join` resolves the src against the page (see utils.make_url_joiner).
+    """
+    src = img.get("src") or img.get("data-src") or img.get("data-lazy-src") or ""
 
-        # CSS background-image fallback
-        if not src:
-            m = re.search(r'url\([\'"]?(.*?)[\'"]?\)', img.get("style", ""))
+    # CSS background-image fallback; the substring test skips the regex
+    # for the common case of no (or an unrelated) style attribute
+    if not src:
+        style = img.get("style") or ""
+        if "url(" in style:
+            m = _BG_URL_RE.search(style)
             if m:
                 src = m.group(1)
 
-        if not src:
-            continue
+    if not src:
+        return None
 
-        imgs.append({
-            "src": make_absolute_url(base_url, src),
-            "alt": img.get("alt") or ""
-        })
+    return {
+        "src": join(src),
+        "alt": img.get("alt") or ""
+    }
 
-    return imgs
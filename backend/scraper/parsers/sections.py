@@ -1,78 +1,154 @@
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+import os
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 
-from backend.scraper.parsers.links import extract_links
-from backend.scraper.parsers.images import extract_images
-from backend.scraper.parsers.lists import extract_lists
-from backend.scraper.utils import truncate_html, generate_label_from_text
+from lxml.html import HtmlElement
 
+from backend.scraper.models import Section, SectionContent
+from backend.scraper.parsers.content import extract_all
+from backend.scraper.process_pool import SpawnPool
+from backend.scraper.utils import truncate_node_html, generate_label_from_text, node_text, node_html, parse_html
 
-def parse_sections_from_soup(soup: BeautifulSoup, source_url: str) -> List[Dict[str, Any]]:
-    sections = []
-    used_html = set()
+
+LANDMARK_TAGS = ("header", "nav", "main", "section", "article", "footer")
+
+# Pages with at least this many landmarks and this much HTML extract them in
+# worker processes (SCRAPER_PARSE_PROCESSES of them; 0 disables, the default
+# on a single core where there is nothing to gain); smaller pages stay
+# in-process since every worker re-parses the whole document, which costs
+# more than it saves on a page of small cards. Each worker gets the source
+# HTML plus a range of landmark indices: parsing the same HTML with the same
+# parser rebuilds exactly the caller's tree, which no re-serialization of a
+# single landmark guarantees (HTML attribute names like @click or :class
+# are not valid XML, and an xmlns attribute would namespace the subtree).
+PARALLEL_MIN_LANDMARKS = int(os.getenv("SCRAPER_PARALLEL_LANDMARKS", "20"))
+PARALLEL_MIN_HTML = int(os.getenv("SCRAPER_PARALLEL_MIN_HTML", "1000000"))
+_CPUS = os.cpu_count() or 1
+PARSE_PROCESSES = int(os.getenv("SCRAPER_PARSE_PROCESSES", str(_CPUS if _CPUS > 1 else 0)))
+
+_PROCESS_POOL = SpawnPool(max_workers=max(PARSE_PROCESSES, 1))
+
+
+def shutdown_process_pool():
+    _PROCESS_POOL.shutdown()
+
+
+def _landmarks(root: HtmlElement) -> List[Tuple[str, HtmlElement]]:
+    return [(tag, el) for tag in LANDMARK_TAGS for el in root.iter(tag)]
+
+
+def _landmark_contents(html: str, base_url: str, start: int, stop: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    (landmark count, extract_all of landmarks[start:stop]) for `html`, parsed
+    afresh; runs in a worker process. The count lets the caller check that
+    the worker saw the same tree.
+    """
+    landmarks = _landmarks(parse_html(html))
+    return len(landmarks), [extract_all(el, base_url) for _, el in landmarks[start:stop]]
+
+
+def _parallel_contents(html: str, source_url: str, count: int) -> Optional[List[Dict[str, Any]]]:
+    """extract_all for every landmark across the process pool, or None if a worker's tree differed."""
+    step = -(-count // PARSE_PROCESSES)
+    starts = range(0, count, step)
+    contents: List[Dict[str, Any]] = []
+    for total, part in _PROCESS_POOL.map(
+        _landmark_contents,
+        [html] * len(starts), [source_url] * len(starts), starts, [s + step for s in starts],
+    ):
+        if total != count:
+            return None
+        contents.extend(part)
+    return contents
+
+
+def parse_sections_from_soup(root: HtmlElement, source_url: str, html: str = "") -> List[Section]:
+    """
+    Extract landmark sections from an lxml document root (see utils.parse_html).
+    `html` is the source the root was parsed from; large pages are split
+    across worker processes with it.
+    """
+    return list(iter_sections(root, source_url, html))
+
+
+def iter_sections(root: HtmlElement, source_url: str, html: str = "") -> Iterator[Section]:
+    """
+    Yield landmark sections one at a time, so a consumer can serialize/ship
+    each one before the next is extracted. Sections are grouped by tag in
+    LANDMARK_TAGS order (every header, then every nav, main, section,
+    article, footer), in document order within each group.
+    """
+    # Emitted landmarks by text. Identical duplicates are skipped; since equal
+    # HTML implies equal text, a landmark is only serialized in full when its
+    # text collides with an earlier one. A text's first landmark is kept as
+    # the element until then, after which the bucket holds the serialized
+    # HTML of each landmark, so every landmark is serialized at most once.
+    seen: Dict[str, Union[HtmlElement, Set[str]]] = {}
     idx = 0
 
-    landmark_tags = ["header", "nav", "main", "section", "article", "footer"]
+    landmarks = _landmarks(root)
+
+    # One pass per landmark for text, headings, links, images, lists
+    contents = None
+    if (
+        PARSE_PROCESSES > 0
+        and len(landmarks) >= PARALLEL_MIN_LANDMARKS
+        and len(html) >= PARALLEL_MIN_HTML
+    ):
+        contents = _parallel_contents(html, source_url, len(landmarks))
 
-    for tag in landmark_tags:
-        for el in soup.find_all(tag):
-            raw_html = str(el)
-            if not raw_html or raw_html in used_html:
+    for i, (tag, el) in enumerate(landmarks):
+        content = contents[i] if contents is not None else extract_all(el, source_url)
+        text = content["text"]
+        if not text:
+            continue
+
+        same_text = seen.get(text)
+        if same_text is None:
+            seen[text] = el
+        else:
+            if not isinstance(same_text, set):
+                same_text = seen[text] = {node_html(same_text)}
+            raw_html = node_html(el)
+            if raw_html in same_text:
                 continue
+            same_text.add(raw_html)
 
-            used_html.add(raw_html)
+        headings = content["headings"]
 
-            headings = [h.get_text(" ", strip=True) for h in el.find_all(["h1", "h2", "h3"])][:5]
-            text = el.get_text(" ", strip=True) or ""
+        raw_snip, truncated = truncate_node_html(el)
+        label = headings[0] if headings else generate_label_from_text(text)
 
-            if not text:
-                continue
+        sec_type = "unknown"
+        if tag == "nav": sec_type = "nav"
+        if tag == "header" and idx == 0: sec_type = "hero"
+        if tag == "footer": sec_type = "footer"
+        if tag == "main": sec_type = "section"
 
-            links = extract_links(el, source_url)
-            images = extract_images(el, source_url)
-            lists = extract_lists(el)
-
-            raw_snip, truncated = truncate_html(raw_html)
-            label = headings[0] if headings else generate_label_from_text(text)
-
-            sec_type = "unknown"
-            if tag == "nav": sec_type = "nav"
-            if tag == "header" and idx == 0: sec_type = "hero"
-            if tag == "footer": sec_type = "footer"
-            if tag == "main": sec_type = "section"
-
-            sections.append({
-                "id": f"{tag}-{idx}",
-                "type": sec_type,
-                "label": label,
-                "sourceUrl": source_url,
-                "content": {
-                    "headings": headings,
-                    "text": text,
-                    "links": links,
-                    "images": images,
-                    "lists": lists,
-                    "tables": []
-                },
-                "rawHtml": raw_snip,
-                "truncated": truncated,
-            })
-            idx += 1
+        yield Section(
+            id=f"{tag}-{idx}",
+            type=sec_type,
+            label=label,
+            sourceUrl=source_url,
+            content=SectionContent(**content),
+            rawHtml=raw_snip,
+            truncated=truncated,
+        )
+        idx += 1
 
     # Fallbacks
-    if not sections:
-        body = soup.body or soup
-        text = body.get_text(" ", strip=True) or ""
-        raw_snip, truncated = truncate_html(str(body))
+    if idx == 0:
+        body = root.find("body")
+        if body is None:
+            body = root
+        text = node_text(body)
+        raw_snip, truncated = truncate_node_html(body)
         if text:
-            sections.append({
-                "id": "body-0",
-                "type": "unknown",
-                "label": generate_label_from_text(text),
-                "sourceUrl": source_url,
-                "content": {"headings": [], "text": text, "links": [], "images": [], "lists": [], "tables": []},
-                "rawHtml": raw_snip,
-                "truncated": truncated,
-            })
-
-    return sections
+            yield Section(
+                id="body-0",
+                type="unknown",
+                label=generate_label_from_text(text),
+                sourceUrl=source_url,
+                content=SectionContent(text=text),
+                rawHtml=raw_snip,
+                truncated=truncated,
+            )
@@ -1,127 +1,276 @@
-import time
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
-from playwright.sync_api import sync_playwright
+from playwright.async_api import Page
 
-from backend.scraper.utils import make_absolute_url, safe_soup
-from backend.scraper.parsers.sections import parse_sections_from_soup
+from backend.scraper.browser_runtime import BROWSER_POOL, BrowserPool, wait_for_quiet
+from backend.scraper.parse_worker import parse_page_async
+from backend.scraper.utils import canonical_url, make_absolute_url, truncate_at_tag
+
+__all__ = [
+    "js_scrape_with_playwright",
+    "js_scrape_many",
+    "js_scrape_hard",
+    "js_scrape_full",
+]
 
 LOG = logging.getLogger(__name__)
 LOG.addHandler(logging.NullHandler())
 
+# Rendered HTML beyond this many characters is cut before parsing; infinite
+# feeds can grow page.content() to tens of MB after a few scrolls.
+MAX_RENDERED_HTML = 1_048_576
+
+# Candidates for auto_click_elements.
+_CLICK_SELECTORS = (
+    "button", "a[href]", "[role='button']", "[onclick]",
+    ".load-more", ".next", ".btn", ".show-more",
+)
+# One selector list, so Blink matches all candidates in a single DOM walk.
+_CLICK_SELECTOR = ", ".join(_CLICK_SELECTORS)
+
+# Next-page controls, in priority order (HN-style 'More' link first).
+_PAGINATION_SELECTORS = (
+    "a.morelink",
+    "a[rel='next']",
+    "a.next",
+    "button.next",
+    ".pagination-next",
+    ".pager-next",
+)
+
+# Visible click candidates in one round-trip (non-empty box, not
+# visibility:hidden / display:none): each is tagged with a
+# data-lyftr-click index so it can be clicked by selector, and reported with
+# its text/href. Links that would leave the page (another URL, or a new tab)
+# are skipped. Tags are removed again by _CLEAR_CLICK_MARKS_JS.
+_CLICK_CANDIDATES_JS = """
+({ sel, max }) => {
+    const out = [];
+    const here = location.href.split('#')[0];
+    for (const n of document.querySelectorAll(sel)) {
+        if (out.length >= max) break;
+        if (n.tagName === 'A' && n.hasAttribute('href')) {
+            if (n.target === '_blank') continue;
+            if (!n.href.startsWith('javascript:') && n.href.split('#')[0] !== here) continue;
+        }
+        const r = n.getBoundingClientRect();
+        if (r.width <= 0 || r.height <= 0) continue;
+        const st = getComputedStyle(n);
+        if (st.visibility === 'hidden' || st.display === 'none') continue;
+        n.setAttribute('data-lyftr-click', String(out.length));
+        out.push({ i: out.length, text: (n.innerText || '').trim(), href: n.getAttribute('href') || '' });
+    }
+    return out;
+}
+"""
+
+_CLEAR_CLICK_MARKS_JS = """
+() => document.querySelectorAll('[data-lyftr-click]').forEach(n => n.removeAttribute('data-lyftr-click'))
+"""
+
+# Which of the given selectors match on the page, with the first match's
+# href: one round-trip instead of a query_selector per selector.
+_MATCHING_SELECTORS_JS = """
+(sels) => {
+    const found = [];
+    for (const s of sels) {
+        let el = null;
+        try { el = document.querySelector(s); } catch (e) {}
+        if (el) found.push([s, el.getAttribute('href')]);
+    }
+    return found;
+}
+"""
+
 
 # -------------------------------------------------
-# Stealth Mode
+# Scroll Helper
 # -------------------------------------------------
-def _apply_stealth(page):
+# Resolves once the DOM has changed and then stayed quiet for quietMs, or
+# after timeoutMs at the latest: "new content appeared" without a fixed sleep.
+_DOM_SETTLED_JS = """
+({ timeoutMs, quietMs }) => new Promise(resolve => {
+    let quiet = null;
+    const done = changed => { obs.disconnect(); clearTimeout(limit); clearTimeout(quiet); resolve(changed); };
+    const obs = new MutationObserver(() => {
+        clearTimeout(quiet);
+        quiet = setTimeout(() => done(true), quietMs);
+    });
+    obs.observe(document.documentElement, { childList: true, subtree: true, characterData: true });
+    const limit = setTimeout(() => done(false), timeoutMs);
+})
+"""
+
+# Scroll to the bottom until the height stops growing. After each scroll it
+# waits for the height to change (MutationObserver) instead of sleeping, with
+# waitMs as the upper bound for a round that loads nothing.
+_AUTO_SCROLL_JS = """
+async ({ maxScrolls, waitMs, settleRounds }) => {
+    const doc = () => document.scrollingElement || document.body;
+    const grown = prev => new Promise(resolve => {
+        const done = v => { obs.disconnect(); clearTimeout(t); resolve(v); };
+        const obs = new MutationObserver(() => { if (doc().scrollHeight !== prev) done(true); });
+        obs.observe(document.documentElement, { childList: true, subtree: true });
+        const t = setTimeout(() => done(doc().scrollHeight !== prev), waitMs);
+    });
+    let last = doc().scrollHeight, same = 0, scrolls = 0;
+    while (scrolls < maxScrolls) {
+        window.scrollTo(0, doc().scrollHeight);
+        scrolls++;
+        if (await grown(last)) {
+            same = 0;
+            last = doc().scrollHeight;
+        } else if (++same >= settleRounds) {
+            break;
+        }
+    }
+    return scrolls;
+}
+"""
+
+# Hard mode: step down by 0.8 viewport with human-like pauses, where a pause
+# ends early once the step has loaded new content.
+_STEP_SCROLL_JS = """
+async ({ steps }) => {
+    const doc = () => document.scrollingElement || document.body;
+    for (let i = 0; i < steps; i++) {
+        const prev = doc().scrollHeight;
+        window.scrollBy(0, window.innerHeight * 0.8);
+        await new Promise(resolve => {
+            const done = () => { obs.disconnect(); clearTimeout(t); resolve(); };
+            const obs = new MutationObserver(() => { if (doc().scrollHeight !== prev) done(); });
+            obs.observe(document.documentElement, { childList: true, subtree: true });
+            const t = setTimeout(done, 500 + (i % 3) * 300);
+        });
+    }
+    return steps;
+}
+"""
+
+
+async def goto(page: Page, url: str, timeout: int = 30000):
+    """
+    Navigate and return once the DOM is ready and the page's own requests
+    have gone quiet (see wait_for_quiet, capped at 8s). Never waits for
+    networkidle, which sites with polling/analytics may never reach.
+    """
+    await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+    await wait_for_quiet(page)
+
+
+async def wait_for_dom_settled(page: Page, timeout_ms: int = 1200, quiet_ms: int = 150):
+    """Wait until the DOM changes and goes quiet (or timeout_ms); errors are ignored."""
     try:
-        page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', { get: () => false });
-            Object.defineProperty(navigator, 'languages', { get: () => ['en-US','en'] });
-            Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
-            window.chrome = window.chrome || { runtime: {} };
-        """)
+        await page.evaluate(_DOM_SETTLED_JS, {"timeoutMs": timeout_ms, "quietMs": quiet_ms})
     except Exception:
+        # e.g. the click navigated and destroyed the execution context
         pass
 
 
-# -------------------------------------------------
-# Scroll Helper
-# -------------------------------------------------
-def smart_scroll(page, max_scrolls: int, result: Dict[str, Any]):
-    last_height = 0
-    for _ in range(max_scrolls):
-        try:
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(1)
-            result["interactions"]["scrolls"] += 1
-
-            new_height = page.evaluate("document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
-        except Exception:
-            break
+async def smart_scroll(page: Page, max_scrolls: int, result: Dict[str, Any]):
+    """
+    Scroll to the bottom until the page height stops growing (or max_scrolls),
+    entirely inside the page: one round-trip instead of one per scroll.
+    """
+    try:
+        scrolls = await page.evaluate(
+            _AUTO_SCROLL_JS, {"maxScrolls": max_scrolls, "waitMs": 400, "settleRounds": 2}
+        )
+        result["interactions"]["scrolls"] += int(scrolls or 0)
+    except Exception:
+        pass
 
 
 # -------------------------------------------------
 # Click Helper
 # -------------------------------------------------
-def auto_click_elements(page, result: Dict[str, Any], max_clicks=5):
-    CLICK_SELECTORS = [
-        "button", "a[href]", "[role='button']", "[onclick]",
-        ".load-more", ".next", ".btn", ".show-more"
-    ]
-
-    clickable = []
-    for sel in CLICK_SELECTORS:
-        try:
-            clickable.extend(page.query_selector_all(sel))
-        except Exception:
-            continue
-
-    clicked = 0
-    for el in clickable:
-        if clicked >= max_clicks:
-            break
-        try:
-            box = el.bounding_box()
-            if not box:
-                continue
+def _without_fragment(url: str) -> str:
+    return url.split("#", 1)[0]
 
-            text = (el.inner_text() or "").strip()
-            href = el.get_attribute("href") or ""
 
-            el.click()
-            time.sleep(1.2)
+async def auto_click_elements(page: Page, result: Dict[str, Any], max_clicks=5):
+    """
+    Click up to `max_clicks` visible candidates. Selection, visibility and
+    text/href are resolved in a single evaluate; only the clicks themselves
+    are separate round-trips. A click that navigates away anyway (onclick,
+    form button) is undone with go_back and ends the clicking, since the
+    remaining candidates were marked in the old document.
+    """
+    try:
+        candidates = await page.evaluate(
+            _CLICK_CANDIDATES_JS, {"sel": _CLICK_SELECTOR, "max": max_clicks}
+        )
+    except Exception:
+        # navigation mid-evaluate, or a bad entry in _CLICK_SELECTORS
+        LOG.debug("Collecting click candidates failed", exc_info=True)
+        return
 
-            result["interactions"]["clicks"].append(text or href)
-            clicked += 1
+    start = _without_fragment(page.url)
+    try:
+        for c in candidates:
+            try:
+                await page.click(f'[data-lyftr-click="{c["i"]}"]', timeout=3000)
+                await wait_for_dom_settled(page)
+            except Exception:
+                pass
+            else:
+                if _without_fragment(page.url) == start:
+                    result["interactions"]["clicks"].append(c["text"] or c["href"])
+                    continue
+            if _without_fragment(page.url) != start:
+                try:
+                    await page.go_back(wait_until="domcontentloaded", timeout=5000)
+                except Exception:
+                    LOG.debug("Returning from click navigation failed", exc_info=True)
+                break
+    finally:
+        # keep the marker attributes out of the rendered HTML
+        try:
+            await page.evaluate(_CLEAR_CLICK_MARKS_JS)
         except Exception:
-            continue
+            pass
 
 
 # -------------------------------------------------
 # Pagination Helper
 # -------------------------------------------------
-def detect_and_click_pagination(page, visited_pages: set, result: Dict[str, Any]) -> Optional[str]:
+async def detect_and_click_pagination(page: Page, visited_pages: Dict[str, str]) -> Optional[str]:
     """
     Improved pagination detection:
     - Handles HN-style 'More' link (a.morelink)
     - Tries to click and wait for navigation; if click doesn't navigate, falls back to href + page.goto()
     - Returns the absolute next-page URL or None if none found / already visited
+    - `visited_pages` is keyed by canonical_url(), so reordered/tracking query params
+      or a fragment don't make an already-scraped page look new; the caller
+      records the returned page there
     """
-    PAGINATION_SELECTORS = [
-        "a.morelink",        
-        "a[rel='next']",
-        "a.next",
-        "button.next",
-        ".pagination-next",
-        ".pager-next"
-    ]
-
-    for sel in PAGINATION_SELECTORS:
+    try:
+        matches = await page.evaluate(_MATCHING_SELECTORS_JS, list(_PAGINATION_SELECTORS))
+    except Exception:
+        return None
+
+    for sel, href in matches:
         try:
-            btn = page.query_selector(sel)
+            btn = await page.query_selector(sel)
             if not btn:
                 continue
 
             # Prefer the href if available (HN uses relative hrefs)
-            href = btn.get_attribute("href")
             absolute = make_absolute_url(page.url, href) if href else page.url
 
             # already visited?
-            if absolute in visited_pages:
+            if canonical_url(absolute) in visited_pages:
                 return None
 
             # Try clicking and wait for navigation; if navigation doesn't happen, fallback to goto(href)
             try:
                 # record current url to detect navigation
                 before = page.url
-                btn.click()
-                # wait for either networkidle or url change
+                await btn.click()
+                # wait for a navigation to reach DOM-ready (no-op if none started)
                 try:
-                    page.wait_for_load_state("networkidle", timeout=5000)
+                    await page.wait_for_load_state("domcontentloaded", timeout=5000)
                 except Exception:
                     # load_state wait may timeout for very fast responses; ignore
                     pass
@@ -129,13 +278,13 @@ def detect_and_click_pagination(page, visited_pages: set, result: Dict[str, Any]
                 after = page.url
                 if after and after != before:
                     # click caused navigation; use the new url
-                    result["interactions"]["pages"].append(after)
+                    if canonical_url(after) in visited_pages:
+                        return None
                     return after
                 else:
                     # Click didn't change URL; try explicit goto if href exists
                     if href:
-                        page.goto(absolute, wait_until="networkidle", timeout=10000)
-                        result["interactions"]["pages"].append(absolute)
+                        await goto(page, absolute, timeout=10000)
                         return absolute
                     else:
                         # no href, no navigation — skip this selector
@@ -145,8 +294,7 @@ def detect_and_click_pagination(page, visited_pages: set, result: Dict[str, Any]
                 # fallback: try direct goto if href exists
                 if href:
                     try:
-                        page.goto(absolute, wait_until="networkidle", timeout=10000)
-                        result["interactions"]["pages"].append(absolute)
+                        await goto(page, absolute, timeout=10000)
                         return absolute
                     except Exception:
                         continue
@@ -159,33 +307,28 @@ def detect_and_click_pagination(page, visited_pages: set, result: Dict[str, Any]
     return None
 
 
-# -------------------------------------------------
-# Extract META
-# -------------------------------------------------
-def extract_meta(soup, url):
-    title = soup.find("title")
-    meta_title = title.text.strip() if title else ""
-
-    desc_tag = soup.find("meta", attrs={"name": "description"})
-    description = desc_tag.get("content", "").strip() if desc_tag else ""
-
-    can = soup.find("link", rel="canonical")
-    canonical = make_absolute_url(url, can.get("href")) if can else None
-
-    lang = soup.html.get("lang") if soup.html and soup.html.get("lang") else ""
-
-    return {
-        "title": meta_title,
-        "description": description,
-        "canonical": canonical,
-        "language": lang
-    }
+def _cap_html(html: str, limit: Optional[int], result: Dict[str, Any]) -> str:
+    """Truncate rendered HTML to `limit` chars (None = no cap), recording a warning."""
+    if limit is None:
+        return html
+    html, truncated = truncate_at_tag(html, limit)
+    if truncated:
+        warning = {"message": f"Rendered HTML truncated to {limit} characters before parsing", "phase": "parse"}
+        warnings = result.setdefault("warnings", [])
+        if warning not in warnings:
+            warnings.append(warning)
+    return html
 
 
 # -------------------------------------------------
 # SIMPLE JS SCRAPER
 # -------------------------------------------------
-def js_scrape_with_playwright(url: str, max_scrolls: int = 3) -> Dict[str, Any]:
+async def js_scrape_with_playwright(
+    url: str,
+    max_scrolls: int = 3,
+    pool: Optional[BrowserPool] = None,
+    max_html_chars: Optional[int] = MAX_RENDERED_HTML,
+) -> Dict[str, Any]:
     result = {
         "sections": [],
         "meta": {},
@@ -194,35 +337,16 @@ def js_scrape_with_playwright(url: str, max_scrolls: int = 3) -> Dict[str, Any]:
     }
 
     try:
-        with sync_playwright() as pw:
-            browser = pw.chromium.launch(
-                headless=True,
-                args=["--disable-blink-features=AutomationControlled"]
-            )
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/125 Safari/537.36",
-                viewport={"width": 1366, "height": 800},
-                locale="en-US"
-            )
-            page = context.new_page()
-            _apply_stealth(page)
-
-            try:
-                page.goto(url, wait_until="networkidle", timeout=30000)
-            except Exception:
-                page.goto(url, wait_until="load", timeout=30000)
-
-            smart_scroll(page, max_scrolls, result)
+        async with (pool or BROWSER_POOL).page(viewport_height=800) as page:
+            await goto(page, url, timeout=30000)
 
-            html = page.content()
-            soup = safe_soup(html)
+            await smart_scroll(page, max_scrolls, result)
 
-            result["meta"] = extract_meta(soup, url)
-            result["sections"] = parse_sections_from_soup(soup, source_url=url)
-            result["interactions"]["pages"] = [url]
+            html = _cap_html(await page.content(), max_html_chars, result)
 
-            context.close()
-            browser.close()
+        parsed = await parse_page_async(html, url)
+        result["meta"], result["sections"] = parsed["meta"], parsed["sections"]
+        result["interactions"]["pages"] = [url]
 
     except Exception as e:
         result["errors"].append({"message": str(e), "phase": "render"})
@@ -230,10 +354,31 @@ def js_scrape_with_playwright(url: str, max_scrolls: int = 3) -> Dict[str, Any]:
     return result
 
 
+async def js_scrape_many(
+    urls: List[str], max_concurrency: int = 5, max_scrolls: int = 3, pool: Optional[BrowserPool] = None
+) -> List[Dict[str, Any]]:
+    """
+    Render many URLs in parallel on the shared browser, at most
+    `max_concurrency` at a time. Results are returned in input order.
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def one(url):
+        async with sem:
+            return await js_scrape_with_playwright(url, max_scrolls=max_scrolls, pool=pool)
+
+    return await asyncio.gather(*(one(u) for u in urls))
+
+
 # -------------------------------------------------
 # HARD SCRAPER (Anti-Bot)
 # -------------------------------------------------
-def js_scrape_hard(url: str, max_scrolls: int = 8, headless: bool = False) -> Dict[str, Any]:
+async def js_scrape_hard(
+    url: str,
+    max_scrolls: int = 8,
+    pool: Optional[BrowserPool] = None,
+    max_html_chars: Optional[int] = MAX_RENDERED_HTML,
+) -> Dict[str, Any]:
     result = {
         "sections": [],
         "meta": {},
@@ -242,43 +387,17 @@ def js_scrape_hard(url: str, max_scrolls: int = 8, headless: bool = False) -> Di
     }
 
     try:
-        with sync_playwright() as pw:
-            browser = pw.chromium.launch(
-                headless=headless,
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage"
-                ]
-            )
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/125 Safari/537.36",
-                viewport={"width": 1366, "height": 768},
-                locale="en-US"
-            )
-            page = context.new_page()
-            _apply_stealth(page)
+        async with (pool or BROWSER_POOL).page() as page:
+            await goto(page, url, timeout=45000)
 
-            try:
-                page.goto(url, wait_until="networkidle", timeout=45000)
-            except Exception:
-                page.goto(url, wait_until="load", timeout=45000)
+            # Slow human-like scrolling, in a single evaluate
+            result["interactions"]["scrolls"] += await page.evaluate(_STEP_SCROLL_JS, {"steps": max_scrolls})
 
-            # Slow human-like scrolling
-            for i in range(max_scrolls):
-                page.evaluate("window.scrollBy(0, window.innerHeight * 0.8)")
-                time.sleep(0.5 + (i % 3) * 0.3)
-                result["interactions"]["scrolls"] += 1
+            html = _cap_html(await page.content(), max_html_chars, result)
 
-            html = page.content()
-            soup = safe_soup(html)
-
-            result["meta"] = extract_meta(soup, url)
-            result["sections"] = parse_sections_from_soup(soup, source_url=url)
-            result["interactions"]["pages"] = [url]
-
-            context.close()
-            browser.close()
+        parsed = await parse_page_async(html, url)
+        result["meta"], result["sections"] = parsed["meta"], parsed["sections"]
+        result["interactions"]["pages"] = [url]
 
     except Exception as e:
         result["errors"].append({"message": str(e), "phase": "render"})
@@ -289,12 +408,13 @@ def js_scrape_hard(url: str, max_scrolls: int = 8, headless: bool = False) -> Di
 # -------------------------------------------------
 # FULL SCRAPER — SCROLL + CLICK + PAGINATION (Depth 3)
 # -------------------------------------------------
-def js_scrape_full(
+async def js_scrape_full(
     url: str,
     scrolls: int = 3,
     clicks: int = 3,
     pagination_limit: int = 3,
-    headless: bool = True
+    pool: Optional[BrowserPool] = None,
+    max_html_chars: Optional[int] = MAX_RENDERED_HTML,
 ) -> Dict[str, Any]:
 
     result = {
@@ -304,61 +424,51 @@ def js_scrape_full(
         "errors": []
     }
 
-    visited_pages = set()
+    # canonical_url -> URL as first reached, in crawl order; the single
+    # record of pages, materialized into interactions.pages at the end
+    visited_pages: Dict[str, str] = {}
 
     try:
-        with sync_playwright() as pw:
-            browser = pw.chromium.launch(
-                headless=headless,
-                args=["--disable-blink-features=AutomationControlled"]
-            )
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/125 Safari/537.36",
-                viewport={"width": 1366, "height": 768},
-                locale="en-US"
-            )
-            page = context.new_page()
-            _apply_stealth(page)
-
+        async with (pool or BROWSER_POOL).page() as page:
             current = url
             depth = 0
 
-            while current and depth < pagination_limit:
-                visited_pages.add(current)
-                result["interactions"]["pages"].append(current)
+            # Open page; later pages are opened by detect_and_click_pagination
+            await goto(page, current)
 
-                # Open page
-                try:
-                    page.goto(current, wait_until="networkidle")
-                except Exception:
-                    page.goto(current, wait_until="load")
+            while current and depth < pagination_limit:
+                visited_pages.setdefault(canonical_url(current), current)
 
                 # Scroll + click
-                smart_scroll(page, scrolls, result)
-                auto_click_elements(page, result, max_clicks=clicks)
+                await smart_scroll(page, scrolls, result)
+                await auto_click_elements(page, result, max_clicks=clicks)
 
-                # Extract
-                html = page.content()
-                soup = safe_soup(html)
+                # Extract in a parse worker while the browser already moves on
+                # to the next page, so parse time hides behind navigation time
+                html = _cap_html(await page.content(), max_html_chars, result)
+                parse = asyncio.create_task(parse_page_async(html, current, depth == 0))
+                try:
+                    # Pagination (not past the last page we'll scrape)
+                    next_page = None
+                    if depth + 1 < pagination_limit:
+                        next_page = await detect_and_click_pagination(page, visited_pages)
+                finally:
+                    parsed = await parse
 
                 if depth == 0:
-                    result["meta"] = extract_meta(soup, current)
+                    result["meta"] = parsed["meta"]
 
-                result["sections"].extend(
-                    parse_sections_from_soup(soup, source_url=current)
-                )
+                result["sections"].extend(parsed["sections"])
 
-                # Pagination
-                next_page = detect_and_click_pagination(page, visited_pages, result)
                 if not next_page:
                     break
                 current = next_page
                 depth += 1
 
-            context.close()
-            browser.close()
+                await wait_for_quiet(page)
 
     except Exception as e:
         result["errors"].append({"message": str(e), "phase": "render"})
 
-    return result
\ No newline at end of file
+    result["interactions"]["pages"] = list(visited_pages.values())
+    return result
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, List, Optional
+
+LOG = logging.getLogger(__name__)
+LOG.addHandler(logging.NullHandler())
+
+
+class SpawnPool:
+    """
+    Lazily started ProcessPoolExecutor using the spawn start method (the
+    server process is threaded, and forking a threaded process is unsafe).
+
+    If a worker dies (e.g. OOM-killed on a huge page) the executor is
+    broken for good, so it is dropped and rebuilt, and the call is retried
+    once on the fresh pool instead of failing every later call too.
+    """
+
+    def __init__(self, max_workers: int, initializer: Optional[Callable[[], None]] = None):
+        self.max_workers = max_workers
+        self._initializer = initializer
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self._initializer,
+                )
+            return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        with self._lock:
+            # a concurrent caller may already have replaced it
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def map(self, fn: Callable, *iterables: Iterable) -> List[Any]:
+        """Blocking executor.map, materialized into a list."""
+        args = [list(it) for it in iterables]
+        for attempt in (1, 2):
+            pool = self._get()
+            try:
+                return list(pool.map(fn, *args))
+            except BrokenProcessPool:
+                self._discard(pool)
+                if attempt == 2:
+                    raise
+                LOG.warning("Process pool broke (worker died); rebuilding it and retrying")
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """fn(*args) in the pool, awaited from the event loop."""
+        loop = asyncio.get_running_loop()
+        for attempt in (1, 2):
+            pool = self._get()
+            try:
+                return await loop.run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                self._discard(pool)
+                if attempt == 2:
+                    raise
+                LOG.warning("Process pool broke (worker died); rebuilding it and retrying")
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
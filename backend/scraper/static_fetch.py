@@ -1,30 +1,140 @@
+import asyncio
 import httpx
 import logging
+import os
+from cachetools import LRUCache
+from typing import List, Optional
+
+from backend.scraper.http_client import DEFAULT_HEADERS, get_client, new_client
 
 LOG = logging.getLogger(__name__)
 LOG.addHandler(logging.NullHandler())
 
+BROWSER_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/125.0.0.0 Safari/537.36")
+}
+
+# Bodies are read in chunks and cut at this many bytes; larger documents
+# would be truncated before parsing anyway.
+MAX_BODY_BYTES = int(os.getenv("SCRAPER_MAX_BODY_BYTES", str(8 * 1024 * 1024)))
+
+# Bodies of responses that carried ETag / Last-Modified, keyed by URL:
+# (etag, last_modified, text, status, headers). Refetches send
+# If-None-Match / If-Modified-Since and reuse the body on 304. Bounded by
+# total body size (characters, SCRAPER_FETCH_CACHE_BYTES) rather than entry
+# count, since a single body can be up to MAX_BODY_BYTES.
+_VALIDATED: LRUCache = LRUCache(
+    maxsize=int(os.getenv("SCRAPER_FETCH_CACHE_BYTES", str(64 * 1024 * 1024))),
+    getsizeof=lambda v: len(v[2]),
+)
+
+
+def _conditional_headers(base: dict, cached) -> dict:
+    if not cached:
+        return base
+    etag, last_modified = cached[0], cached[1]
+    headers = dict(base)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _remember(url: str, r: httpx.Response, text: str):
+    etag = r.headers.get("etag")
+    last_modified = r.headers.get("last-modified")
+    if (etag or last_modified) and len(text) <= _VALIDATED.maxsize:
+        _VALIDATED[url] = (etag, last_modified, text, r.status_code, dict(r.headers))
+    else:
+        _VALIDATED.pop(url, None)
+
+
+async def _read_text(r: httpx.Response) -> str:
+    """
+    Read a streamed text/HTML/XML body, at most MAX_BODY_BYTES of it. Other
+    content types (PDFs, images, downloads) are rejected before any of the
+    body is transferred.
+    """
+    ctype = r.headers.get("content-type", "").lower()
+    if ctype and not ctype.startswith("text/") and "html" not in ctype and "xml" not in ctype:
+        raise ValueError(f"Unsupported content type: {ctype}")
+
+    chunks = []
+    total = 0
+    async for chunk in r.aiter_bytes(65536):
+        chunks.append(chunk)
+        total += len(chunk)
+        if total >= MAX_BODY_BYTES:
+            LOG.debug("Body of %s cut at %d bytes", r.url, MAX_BODY_BYTES)
+            break
+    body = b"".join(chunks)[:MAX_BODY_BYTES]
+    return body.decode(r.encoding or "utf-8", errors="replace")
+
+
+async def _handle(url: str, r: httpx.Response, cached):
+    if r.status_code == 304 and cached:
+        LOG.debug("Not modified, reusing cached body for %s", url)
+        return cached[2], cached[3], cached[4]
+
+    r.raise_for_status()
+    text = await _read_text(r)
+    _remember(url, r, text)
+    return text, r.status_code, dict(r.headers)
+
+
+async def _fetch(client: httpx.AsyncClient, url: str, timeout: int):
+    cached = _VALIDATED.get(url)
+    timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+    try:
+        headers = _conditional_headers(DEFAULT_HEADERS, cached)
+        async with client.stream("GET", url, headers=headers, timeout=timeout) as r:
+            if r.status_code != 403:
+                return await _handle(url, r, cached)
+            # drain the (small) error body so the connection can be reused
+            await r.aread()
+
+        LOG.debug("Retrying with browser headers")
+        headers = _conditional_headers(BROWSER_HEADERS, cached)
+        async with client.stream("GET", url, headers=headers, timeout=timeout) as r:
+            return await _handle(url, r, cached)
+
+    except Exception:
+        LOG.exception("static_scrape failed")
+        raise
+
+
+async def static_scrape(url: str, timeout: int = 12, client: Optional[httpx.AsyncClient] = None):
+    """
+    Fetch `url` and return (text, status, headers). Uses the shared client
+    unless one is passed in (e.g. a client on a mock transport).
+    """
+    return await _fetch(client or await get_client(), url, timeout)
+
+
+async def static_scrape_many(
+    urls: List[str], concurrency: int = 20, timeout: int = 12, client: Optional[httpx.AsyncClient] = None
+) -> list:
+    """
+    Fetch many URLs over the shared pool (or `client`), at most `concurrency` in flight.
+    Returns one entry per URL, in order: (text, status, headers) or the exception raised.
+    """
+    client = client or await get_client()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(url):
+        async with sem:
+            return await _fetch(client, url, timeout)
+
+    return await asyncio.gather(*(one(u) for u in urls), return_exceptions=True)
+
+
+def static_scrape_sync(url: str, timeout: int = 12):
+    """Blocking shim for callers without an event loop (uses its own short-lived client)."""
+    async def run():
+        async with new_client() as client:
+            return await _fetch(client, url, timeout)
 
-def static_scrape(url: str, timeout: int = 12):
-    default_headers = {"User-Agent": "Lyftr-Assignment-Bot/1.0"}
-    browser_headers = {
-        "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                       "AppleWebKit/537.36 (KHTML, like Gecko) "
-                       "Chrome/125.0.0.0 Safari/537.36")
-    }
-
-    with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-        try:
-            r = client.get(url, headers=default_headers)
-            if r.status_code == 403:
-                LOG.debug("Retrying with browser headers")
-                r2 = client.get(url, headers=browser_headers)
-                r2.raise_for_status()
-                return r2.text, r2.status_code, dict(r2.headers)
-
-            r.raise_for_status()
-            return r.text, r.status_code, dict(r.headers)
-
-        except Exception:
-            LOG.exception("static_scrape failed")
-            raise
+    return asyncio.run(run())
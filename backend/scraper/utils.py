@@ -1,13 +1,35 @@
 import logging
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-import re
+from functools import lru_cache
+from html import escape
+from typing import Callable
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
 
 LOG = logging.getLogger(__name__)
 LOG.addHandler(logging.NullHandler())
 
+# Subtrees that never contribute to extracted sections; parse_html drops them
+# before any traversal, so text/XPath work only sees content nodes.
+NOISE_TAGS = ("script", "style", "svg", "template", "noscript")
 
+# Text nodes under a node (comments are not text nodes). Relies on
+# parse_html having stripped NOISE_TAGS.
+_XP_TEXT = etree.XPath("descendant::text()", smart_strings=False)
+
+
+# Client-rendered app shells: the framework's mount point is still empty in
+# the server HTML (CRA/Vite "root"/"app", Next.js "__next").
+_XP_EMPTY_APP_ROOT = etree.XPath(
+    "boolean(//body//div[(@id='root' or @id='app' or @id='__next') and not(*) and not(normalize-space())])"
+)
+
+
+@lru_cache(maxsize=4096)
 def make_absolute_url(base: str, href: str) -> str:
+    # Cached: pages repeat the same relative hrefs (nav, footer, pagination)
+    # and urljoin re-parses `base` on every call.
     if not href:
         return ""
     try:
@@ -16,11 +38,173 @@ def make_absolute_url(base: str, href: str) -> str:
         return href or ""
 
 
-def safe_soup(html: str) -> BeautifulSoup:
+def make_url_joiner(base: str) -> Callable[[str], str]:
+    """
+    make_absolute_url bound to one base URL, for resolving every link/image
+    of a page. The base is split once; absolute, protocol-relative and
+    fragment-only hrefs skip urljoin entirely.
+    """
+    scheme = urlsplit(base).scheme
+    base_nofrag = base.split("#", 1)[0]
+
+    def join(href: str) -> str:
+        if not href:
+            return ""
+        if href.startswith(("http://", "https://")):
+            return href
+        if href.startswith("//"):
+            return f"{scheme}:{href}"
+        if href.startswith("#"):
+            return base_nofrag + href
+        return make_absolute_url(base, href)
+
+    return join
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for use as a cache key: lowercase scheme/host,
+    drop the fragment and sort query parameters.
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+# Query parameters that never change page content: campaign tracking,
+# click ids and session tokens.
+_TRACKING_PARAMS = frozenset(("fbclid", "gclid", "msclkid", "ref", "jsessionid", "phpsessid", "sid"))
+
+
+def canonical_url(url: str) -> str:
+    """
+    Key for "same page" checks while paginating: normalize_url, plus
+    tracking/session query parameters dropped and no trailing slash on
+    non-root paths.
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def parse_html(html: str) -> HtmlElement:
+    """
+    Parse a document with lxml and strip NOISE_TAGS subtrees.
+    Always returns an <html> root, even for empty/broken input: there is no
+    second, slower parser to fall back to.
+    """
     try:
-        return BeautifulSoup(html, "lxml")
-    except Exception:
-        return BeautifulSoup(html, "html.parser")
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # str input carrying an XML encoding declaration
+            root = lxml.html.document_fromstring(html.encode("utf-8"))
+    except etree.ParserError as e:
+        LOG.debug("Unparseable document (%s); using an empty one", e)
+        return lxml.html.document_fromstring("<html></html>")
+
+    etree.strip_elements(root, *NOISE_TAGS, with_tail=False)
+    return root
+
+
+def node_text(el: HtmlElement) -> str:
+    """Whitespace-normalized visible text, like bs4's el.get_text(" ", strip=True)."""
+    return " ".join(t for t in (s.strip() for s in _XP_TEXT(el)) if t)
+
+
+def node_html(el: HtmlElement) -> str:
+    """Serialized HTML of an element, without its tail text (like str(tag) in bs4)."""
+    return etree.tostring(el, encoding="unicode", method="html", with_tail=False)
+
+
+_CHUNK_MARK = "\ue000"
+
+
+def is_app_shell(root: HtmlElement) -> bool:
+    """True when the document is a client-rendered shell with an empty mount point."""
+    return _XP_EMPTY_APP_ROOT(root)
+
+
+def _html_chunks(el: HtmlElement):
+    """
+    node_html(el) in document-order pieces, one node at a time, so a caller
+    can stop early without serializing the whole subtree.
+    """
+    if len(el) == 0:
+        yield etree.tostring(el, encoding="unicode", method="html", with_tail=False)
+        return
+    # copy with the start tag, attributes and leading text, and a marker
+    # child standing in for the real children (an empty copy would lose
+    # optional end tags such as </li>)
+    shell = el.makeelement(el.tag, el.attrib)
+    shell.text = el.text
+    shell.append(etree.Comment(_CHUNK_MARK))
+    start, _, end = etree.tostring(shell, encoding="unicode", method="html").rpartition(
+        f"<!--{_CHUNK_MARK}-->"
+    )
+    yield start
+    for child in el:
+        yield from _html_chunks(child)
+        if child.tail:
+            yield escape(child.tail, quote=False)
+    yield end
+
+
+def truncate_node_html(el: HtmlElement, limit: int = 2000):
+    """
+    Same result as truncate_html(node_html(el), limit), but serialization
+    stops once `limit` is exceeded instead of building the full string for
+    a large landmark only to cut it.
+    """
+    parts = []
+    total = 0
+    for chunk in _html_chunks(el):
+        parts.append(chunk)
+        total += len(chunk)
+        if total > limit:
+            return "".join(parts)[:limit], True
+    return "".join(parts), False
+
+
+def extract_page_meta(root: HtmlElement, url: str) -> dict:
+    """
+    Collect title/description/language/canonical in a single walk over
+    <head> (the whole tree only when there is no head) instead of one find()
+    per field. og:title / og:description are preferred / used as fallback
+    respectively, as before.
+    """
+    title = og_title = description = og_description = ""
+    lang = root.get("lang") or ""
+    canonical_href = None
+
+    head = root.find("head")
+    for el in (root if head is None else head).iter("title", "meta", "link"):
+        name = el.tag
+        if name == "meta":
+            prop = el.get("property")
+            if prop == "og:title" and not og_title:
+                og_title = el.get("content") or ""
+            elif prop == "og:description" and not og_description:
+                og_description = el.get("content", "")
+            elif el.get("name") == "description" and not description:
+                description = el.get("content", "")
+        elif name == "title":
+            if not title:
+                title = el.text or ""
+        elif name == "link":
+            if canonical_href is None and "canonical" in (el.get("rel") or "").split() and el.get("href"):
+                canonical_href = el.get("href")
+
+    return {
+        "title": (og_title or title).strip(),
+        "description": (description or og_description).strip(),
+        "language": lang,
+        "canonical": make_absolute_url(url, canonical_href) if canonical_href else None,
+    }
 
 
 def truncate_html(html: str, limit: int = 2000):
@@ -28,8 +212,20 @@ def truncate_html(html: str, limit: int = 2000):
     return html[:limit], truncated
 
 
+def truncate_at_tag(html: str, limit: int):
+    """
+    Cut `html` to at most `limit` characters, ending right after the last
+    complete tag so the parser never sees half a tag. Returns (html, truncated).
+    """
+    if len(html) <= limit:
+        return html, False
+    cut = html.rfind(">", 0, limit) + 1
+    return html[:cut or limit], True
+
+
 def generate_label_from_text(text: str, words: int = 6):
-    tokens = re.split(r"\s+", (text or "").strip())
+    # str.split(None, n) is a C-level whitespace split; no regex needed
+    tokens = (text or "").split(None, words)
     if not tokens:
         return "Section"
     return " ".join(tokens[:words])
@@ -33,4 +33,4 @@ pip install -r requirements.txt
 # Step 5: Start FastAPI server
 # ----------------------------
 echo "Starting FastAPI server at http://localhost:8000 ..."
-uvicorn backend.main:app --reload --host 0.0.0.0 --port 8000
+uvicorn backend.main:app --reload --host 0.0.0.0 --port 8000 --loop uvloop --http httptools